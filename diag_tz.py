@@ -1,3 +1,4 @@
+import functools
 import zoneinfo
 import pandas_market_calendars as mcal
 from tastytrade.utils import now_in_new_york
@@ -5,16 +6,25 @@ import logging
 
 logging.basicConfig(level=logging.DEBUG)
 
+@functools.lru_cache(maxsize=None)
+def _zi(key):
+    return zoneinfo.ZoneInfo(key)
+
+@functools.lru_cache(maxsize=None)
+def _pytz(key):
+    import pytz
+    return pytz.timezone(key)
+
 print("Checking ZoneInfo for US/Eastern...")
 try:
-    zi = zoneinfo.ZoneInfo("US/Eastern")
+    zi = _zi("US/Eastern")
     print(f"Success: {zi}")
 except Exception as e:
     print(f"FAILED ZoneInfo(US/Eastern): {e}")
 
 print("\nChecking ZoneInfo for America/New_York...")
 try:
-    zi = zoneinfo.ZoneInfo("America/New_York")
+    zi = _zi("America/New_York")
     print(f"Success: {zi}")
 except Exception as e:
     print(f"FAILED ZoneInfo(America/New_York): {e}")
@@ -36,15 +46,14 @@ except Exception as e:
 
 print("\nTesting known problematic key America/Argentina/Buenos_Aires...")
 try:
-    zi = zoneinfo.ZoneInfo("America/Argentina/Buenos_Aires")
+    zi = _zi("America/Argentina/Buenos_Aires")
     print(f"Success: {zi}")
 except Exception as e:
     print(f"FAILED ZoneInfo(America/Argentina/Buenos_Aires): {e}")
 
 print("\nChecking pytz for America/New_York...")
 try:
-    import pytz
-    tz = pytz.timezone("America/New_York")
+    tz = _pytz("America/New_York")
     print(f"Success: {tz}")
 except Exception as e:
     print(f"FAILED pytz.timezone(America/New_York): {e}")
@@ -59,7 +68,7 @@ except Exception as e:
 
 print("\nChecking pytz for America/Argentina/Buenos_Aires...")
 try:
-    tz = pytz.timezone("America/Argentina/Buenos_Aires")
+    tz = _pytz("America/Argentina/Buenos_Aires")
     print(f"Success: {tz}")
 except Exception as e:
     print(f"FAILED pytz.timezone(America/Argentina/Buenos_Aires): {e}")
@@ -1,18 +1,25 @@
+import importlib.util
 import random
+import sys
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, NamedTuple
 
 
-# Enforce usage of TastyTrade SDK
-try:
-    from tastytrade import Session
-    from tastytrade.instruments import NestedOptionChain, OptionType
-    from tastytrade.market_data import get_market_data, get_market_data_by_type
-    from tastytrade.order import InstrumentType
-except ImportError:
-    raise ImportError("TastyTrade SDK is required but not installed.")
+# The TastyTrade SDK pulls in a large dependency graph, so it is only
+# imported once a provider is actually created.
+HAS_TT_SDK = importlib.util.find_spec("tastytrade") is not None
+
+class OptionQuote(NamedTuple):
+    """One side (CALL or PUT) of a strike in an option chain."""
+    strike: float
+    type: str
+    bid: float
+    ask: float
+    expiry: str
+
 
 class QuoteProvider:
     """Base class for quote providers."""
@@ -25,8 +32,16 @@ class QuoteProvider:
 
 class TastyTradeQuoteProvider(QuoteProvider):
     """Real provider using TastyTrade API."""
+
+    # get_market_data_by_type accepts at most this many symbols per call
+    MAX_SYMBOLS_PER_REQUEST = 100
     
     def __init__(self, client_id: str, client_secret: str, refresh_token: str, timezone: str = "America/New_York"):
+        # Enforce usage of TastyTrade SDK
+        try:
+            from tastytrade import Session
+        except ImportError:
+            raise ImportError("TastyTrade SDK is required but not installed.")
 
         # Set the global timezone for the SDK
         # Set the global timezone for the SDK
@@ -36,12 +51,12 @@ class TastyTradeQuoteProvider(QuoteProvider):
             
             try:
                 tastytrade.utils.TZ = ZoneInfo(timezone)
-                logging.info(f"TastyTrade SDK timezone set to: {timezone}")
+                logging.info("TastyTrade SDK timezone set to: %s", timezone)
             except (ZoneInfoNotFoundError, ValueError) as e:
-                logging.error(f"Requested timezone '{timezone}' failed ({e}). Falling back to America/New_York.")
+                logging.error("Requested timezone '%s' failed (%s). Falling back to America/New_York.", timezone, e)
                 tastytrade.utils.TZ = ZoneInfo("America/New_York")
         except Exception as e:
-            logging.error(f"Failed to set TastyTrade timezone: {e}")
+            logging.error("Failed to set TastyTrade timezone: %s", e)
 
         self.session = Session(
             provider_secret=client_secret,
@@ -52,6 +67,8 @@ class TastyTradeQuoteProvider(QuoteProvider):
         # client_id is usually used to get the refresh token.
 
     def get_quote(self, symbol: str) -> dict:
+        from tastytrade.market_data import get_market_data
+        from tastytrade.order import InstrumentType
         try:
             # We assume it's an equity for SPY
             data = get_market_data(self.session, symbol, InstrumentType.EQUITY)
@@ -63,10 +80,12 @@ class TastyTradeQuoteProvider(QuoteProvider):
                 "timestamp": datetime.now().strftime("%H:%M:%S")
             }
         except Exception as e:
-            logging.error(f"Error fetching quote for {symbol}: {e}")
+            logging.error("Error fetching quote for %s: %s", symbol, e)
             return {}
 
     def get_option_chain(self, symbol: str) -> list:
+        from tastytrade.instruments import NestedOptionChain
+        from tastytrade.market_data import get_market_data_by_type
         try:
             # Get the nested chain
             chains = NestedOptionChain.get(self.session, symbol)
@@ -82,44 +101,41 @@ class TastyTradeQuoteProvider(QuoteProvider):
                 return []
                 
             expiration = chain.expirations[0]
-            expiry_str = expiration.expiration_date.strftime("%Y-%m-%d")
+            # Interned so every OptionQuote in the chain shares one string object
+            expiry_str = sys.intern(expiration.expiration_date.strftime("%Y-%m-%d"))
             
             # Prepare all symbols to fetch market data in one go
             call_symbols = [strike.call_streamer_symbol for strike in expiration.strikes]
             put_symbols = [strike.put_streamer_symbol for strike in expiration.strikes]
             
-            # Fetch market data for all options
-            # Note: combined limit is 100, we might need to chunk if strikes > 50
+            # Fetch market data for all options, in concurrent requests
+            # of up to MAX_SYMBOLS_PER_REQUEST symbols each
             all_symbols = call_symbols + put_symbols
-            # For simplicity, we'll just take the first few if it's too many
-            if len(all_symbols) > 100:
-                all_symbols = all_symbols[:100]
-            
-            market_data_list = get_market_data_by_type(self.session, options=all_symbols)
-            data_map = {md.symbol: md for md in market_data_list}
+            step = self.MAX_SYMBOLS_PER_REQUEST
+            chunks = [all_symbols[i:i + step] for i in range(0, len(all_symbols), step)]
+            if len(chunks) <= 1:
+                results = [get_market_data_by_type(self.session, options=c) for c in chunks]
+            else:
+                with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+                    results = list(pool.map(lambda c: get_market_data_by_type(self.session, options=c), chunks))
+            # Keep only the two prices per symbol, not the full MarketData objects
+            data_map = {}
+            for market_data_list in results:
+                for md in market_data_list:
+                    data_map[md.symbol] = (float(md.bid or 0.0), float(md.ask or 0.0))
+            no_quote = (0.0, 0.0)
             
             options = []
             for strike in expiration.strikes:
+                strike_price = float(strike.strike_price)
                 # Calls
-                call_md = data_map.get(strike.call_streamer_symbol)
-                options.append({
-                    "strike": float(strike.strike_price),
-                    "type": "CALL",
-                    "bid": float(call_md.bid) if call_md and call_md.bid else 0.0,
-                    "ask": float(call_md.ask) if call_md and call_md.ask else 0.0,
-                    "expiry": expiry_str
-                })
+                bid, ask = data_map.get(strike.call_streamer_symbol, no_quote)
+                options.append(OptionQuote(strike_price, "CALL", bid, ask, expiry_str))
                 # Puts
-                put_md = data_map.get(strike.put_streamer_symbol)
-                options.append({
-                    "strike": float(strike.strike_price),
-                    "type": "PUT",
-                    "bid": float(put_md.bid) if put_md and put_md.bid else 0.0,
-                    "ask": float(put_md.ask) if put_md and put_md.ask else 0.0,
-                    "expiry": expiry_str
-                })
+                bid, ask = data_map.get(strike.put_streamer_symbol, no_quote)
+                options.append(OptionQuote(strike_price, "PUT", bid, ask, expiry_str))
             
             return options
         except Exception as e:
-            logging.error(f"Error fetching option chain for {symbol}: {e}")
+            logging.error("Error fetching option chain for %s: %s", symbol, e)
             return []
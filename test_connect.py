@@ -1,7 +1,9 @@
 
 import sys
 import os
+import configparser
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Fix path to allow importing from current directory
@@ -10,6 +12,16 @@ sys.path.append(os.getcwd())
 # Setup basic logging to stdout
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# [tt_globals] key -> credentials field. Keep in step with ConfigManager.CRED_KEYS:
+# importing spyscalp would pull in Textual and create ~/.spyscalp, and this script
+# has to run standalone against a config file in the current directory.
+_CRED_KEYS = {
+    "tt-client-secret": "secret",
+    "tt-client-ID": "id",
+    "tt-refresh-token": "token",
+    "tt-timezone": "timezone",
+}
+
 def test_connection():
     print("----------------------------------------------------------------")
     print("Testing TastyTrade Connection...")
@@ -30,16 +42,14 @@ def test_connection():
     # Read manually since ConfigManager is in main.py and relies on CWD constant
     creds = {}
     try:
-        with open(config_path, "r") as f:
-            for line in f:
-                if "=" in line:
-                    key, val = line.split("=", 1)
-                    key = key.strip()
-                    val = val.strip().strip('"').strip("'")
-                    if key == "tt-client-secret": creds["secret"] = val
-                    elif key == "tt-client-ID": creds["id"] = val
-                    elif key == "tt-refresh-token": creds["token"] = val
-                    elif key == "tt-timezone": creds["timezone"] = val
+        # Leading section so keys above [tt_globals] (older files) still parse
+        parser = configparser.ConfigParser(interpolation=None, allow_no_value=True, strict=False)
+        parser.optionxform = str  # keep tt-client-ID as written
+        parser.read_string("[tastytrade]\n" + config_path.read_text())
+        for section in parser.values():
+            for key, field in _CRED_KEYS.items():
+                if section.get(key):
+                    creds[field] = section[key].strip('"\'')
     except Exception as e:
         print(f"ERROR: Failed to parse config: {e}")
         return False
@@ -66,15 +76,18 @@ def test_connection():
         )
         print("Session initialized.")
         
-        print("Fetching SPY quote...")
-        quote = provider.get_quote("SPY")
+        # Separate endpoints on the same session, so fetch both at once
+        print("Fetching SPY quote and option chain...")
+        with ThreadPoolExecutor(2) as pool:
+            quote_future = pool.submit(provider.get_quote, "SPY")
+            chain_future = pool.submit(provider.get_option_chain, "SPY")
+            quote = quote_future.result()
+            chain = chain_future.result()
         print(f"Quote received: {quote}")
         
         if not quote:
             print("WARNING: Quote was empty (market might be closed or data unavailable).")
         
-        print("Fetching SPY Option Chain...")
-        chain = provider.get_option_chain("SPY")
         print(f"Option chain received: {len(chain)} options retrieved.")
         if chain:
              print(f"Sample option: {chain[0]}")
@@ -83,10 +96,8 @@ def test_connection():
         print("SUCCESS: Connection verified and data received.")
         return True
         
-    except Exception as e:
-        print(f"ERROR: Connection test failed: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logging.exception("Connection test failed")
         return False
 
 if __name__ == "__main__":